@@ -1,9 +1,18 @@
 # standard library imports
+import argparse
+import hashlib
+import heapq
+import json
 import os.path
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 import logging
+from operator import itemgetter
 import socket
-import re
+import sys
+import tempfile
+import time
+from typing import Optional
 
 # 3rd party imports
 from google.auth.transport.requests import Request
@@ -11,21 +20,117 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 
 SECS_IN_DAY = 86400
 SECS_IN_MINUTE = 60
 MINUTES_IN_HOUR = 60
 # If modifying these scopes, delete the file token.json.
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
+CALENDAR_ID = "primary"
+# largest page size the Calendar API accepts for events.list
+MAX_RESULTS = 2500
+# events fetched from the API are cached here, see GCalAuditor.query_events
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gcal-audit")
+CACHE_TTL_CURRENT = 5 * SECS_IN_MINUTE
+CACHE_TTL_PAST = SECS_IN_DAY
 DAYS_OF_WEEK = [
     "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
 ]
+# marks the tag list in an event description, e.g. "[Tags: work, email]"
+TAGS_PREFIX = "[Tags:"
+TAGS_SUFFIX = "]"
+
+
+def _find_tags(description: str) -> Optional[str]:
+    """Return the comma separated tags of the first "[Tags:...]" in a description."""
+    start = description.find(TAGS_PREFIX)
+    if start < 0:
+        return None
+    start += len(TAGS_PREFIX)
+    end = description.find(TAGS_SUFFIX, start)
+    if end < 0:
+        return None
+    return description[start:end]
+
+
+def _iso_seconds(timestamp: str) -> int:
+    """Return the seconds since midnight of an RFC3339 timestamp.
+
+    The UTC offset is ignored, so only timestamps sharing the same offset can be
+    compared, e.g. "2024-06-03T10:20:00-07:00" -> 37200.
+    """
+    return (
+        int(timestamp[11:13]) * 3600
+        + int(timestamp[14:16]) * SECS_IN_MINUTE
+        + int(timestamp[17:19])
+    )
+
+
+def _iso_duration(start: str, end: str) -> int:
+    """Return the seconds between two RFC3339 timestamps.
+
+    Timestamps sharing a UTC offset are compared from their string slices. When
+    the offsets differ, e.g. an event crossing a DST change, both are parsed
+    with datetime.fromisoformat instead.
+    """
+    if start[19:] != end[19:]:
+        duration = datetime.fromisoformat(end) - datetime.fromisoformat(start)
+        return int(duration.total_seconds())
+    seconds = _iso_seconds(end) - _iso_seconds(start)
+    # the event crosses midnight
+    if start[:10] != end[:10]:
+        days = date.fromisoformat(end[:10]) - date.fromisoformat(start[:10])
+        seconds += days.days * SECS_IN_DAY
+    return seconds
+
+
+class Event:
+    """A calendar event, projected from the Google Calendar API resource.
+
+    Only the fields the audit reads are kept, in slots, so the hot loops do one
+    attribute lookup per field instead of walking the nested resource dicts.
+    """
+
+    __slots__ = ("start", "end", "duration", "summary", "description")
+
+    def __init__(
+        self, start: str, end: str, summary: str, description: Optional[str] = None
+    ):
+        """Initialize the event.
+
+        Parameters
+        ----------
+        start: str
+            The RFC3339 start time of the event.
+        end: str
+            The RFC3339 end time of the event.
+        summary: str
+            The title of the event.
+        description: str, optional
+            The description of the event.
+        """
+        self.start = start
+        self.end = end
+        self.duration = _iso_duration(start, end)
+        self.summary = summary
+        self.description = description
+
+    @classmethod
+    def from_resource(cls, resource: dict) -> "Event":
+        """Create an event from a Google Calendar API event resource."""
+        return cls(
+            resource["start"]["dateTime"],
+            resource["end"]["dateTime"],
+            resource["summary"],
+            resource.get("description"),
+        )
 
 
 class DateInputter:
 
-    def input_day(self) -> tuple[datetime, datetime]:
-        date = input("Enter the day (YYYY-MM-DD). Press Enter for today:\n")
+    def day(self, date: Optional[str] = None) -> tuple[datetime, datetime]:
+        """Return the start and end of a day (YYYY-MM-DD), today by default."""
         if not date:
             date = datetime.now().strftime("%Y-%m-%d")
         start_datetime = date + "T00:00:00-07:00"
@@ -34,10 +139,8 @@ class DateInputter:
             datetime.fromisoformat(start_datetime), datetime.fromisoformat(end_datetime)
         )
 
-    def input_week(self) -> tuple[datetime, datetime]:
-        date = input(
-            "Enter the start day (YYYY-MM-DD) of the week. Press Enter for today:\n"
-        )
+    def week(self, date: Optional[str] = None) -> tuple[datetime, datetime]:
+        """Return the start and end of the week starting on a day (YYYY-MM-DD)."""
         if not date:
             date = datetime.now().strftime("%Y-%m-%d")
         start_datetime = date + "T00:00:00-07:00"
@@ -47,24 +150,55 @@ class DateInputter:
             datetime.fromisoformat(start_datetime), datetime.fromisoformat(end_datetime)
         )
 
-    def input_datetime_range(self) -> tuple[datetime, datetime]:
-        start_date = input("Enter the start day (YYYY-MM-DD). Press Enter for today:\n")
+    def datetime_range(
+        self,
+        start_date: Optional[str] = None,
+        start_time: Optional[str] = None,
+        end_date: Optional[str] = None,
+        end_time: Optional[str] = None,
+    ) -> tuple[datetime, datetime]:
+        """Return the start and end of a datetime range.
+
+        Dates are YYYY-MM-DD and times HH:MM. The range defaults to the whole of
+        today, and the end date defaults to the start date. Raises ValueError if
+        the end is not after the start.
+        """
         if not start_date:
             start_date = datetime.now().strftime("%Y-%m-%d")
-        start_time = input("Enter the start time (HH:MM): ")
         if not start_time:
             start_time = "00:00"
-        end_date = input("Enter the end date (YYYY-MM-DD): ")
         if not end_date:
             end_date = start_date
-        end_time = input("Enter the end time (HH:MM): ")
         if not end_time:
             end_time = "23:59"
         start_datetime = f"{start_date}T{start_time}:00-07:00"
         end_datetime = f"{end_date}T{end_time}:00-07:00"
-        return (
-            datetime.fromisoformat(start_datetime), datetime.fromisoformat(end_datetime)
+        start_datetime = datetime.fromisoformat(start_datetime)
+        end_datetime = datetime.fromisoformat(end_datetime)
+        if end_datetime <= start_datetime:
+            raise ValueError("the end must be after the start")
+        return start_datetime, end_datetime
+
+    def input_day(self) -> tuple[datetime, datetime]:
+        date = input("Enter the day (YYYY-MM-DD). Press Enter for today:\n")
+        return self.day(date)
+
+    def input_week(self) -> tuple[datetime, datetime]:
+        date = input(
+            "Enter the start day (YYYY-MM-DD) of the week. Press Enter for today:\n"
         )
+        return self.week(date)
+
+    def input_datetime_range(self) -> tuple[datetime, datetime]:
+        start_date = input("Enter the start day (YYYY-MM-DD). Press Enter for today:\n")
+        start_time = input("Enter the start time (HH:MM): ")
+        end_date = input("Enter the end date (YYYY-MM-DD): ")
+        end_time = input("Enter the end time (HH:MM): ")
+        try:
+            return self.datetime_range(start_date, start_time, end_date, end_time)
+        except ValueError as error:
+            print(f"INVALID RANGE: {error}. TRY AGAIN.\n")
+            return self.input_datetime_range()
 
 
 class GCalAuditor:
@@ -78,8 +212,12 @@ class GCalAuditor:
             Whether to audit only the first tag in the event description.
         """
         self._audit_first_tag_only = None
+        self._top_k = None
+        self._refresh_cache = False
         self._total_duration = None
         self._date_inputter = DateInputter()
+        self._creds = None
+        self._service = None
 
     def authenticate_user(self) -> Credentials:
         """
@@ -89,10 +227,13 @@ class GCalAuditor:
         -------
         Credentials: The user credentials.
         """
-        creds = None
+        # reuse the credentials from a previous call while they are still valid
+        if self._creds and self._creds.valid:
+            return self._creds
+        creds = self._creds
         # The file token.json stores the user's access and refresh tokens, and is
         # created automatically when the authorization flow completes the first time.
-        if os.path.exists("token.json"):
+        if not creds and os.path.exists("token.json"):
             creds = Credentials.from_authorized_user_file("token.json", SCOPES)
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
@@ -106,56 +247,182 @@ class GCalAuditor:
                 # Save the credentials for the next run
                 with open("token.json", "w") as token:
                     token.write(creds.to_json())
+        # the cached service is bound to the previous credentials
+        if creds is not self._creds:
+            self._service = None
+        self._creds = creds
         return creds
 
     def query_events(
         self, start_datetime: datetime, end_datetime: datetime
-    ) -> list[dict]:
+    ) -> list[Event]:
         """
         Query the user's calendar for events on a specific date.
+
+        Results are cached on disk under CACHE_DIR, so rerunning an audit for the
+        same days does not hit the API again until the cache expires. With
+        --refresh the cache is bypassed and overwritten with fresh results.
         """
         self._total_duration = (end_datetime - start_datetime).total_seconds()
-        creds = self.authenticate_user()
-        try:
-            service = build("calendar", "v3", credentials=creds)
-            events_result = (
-                service.events()
-                .list(
-                    calendarId="primary",
-                    # 07:00 is Pacific Time, 05:00 is Central Time
-                    timeMin=start_datetime.strftime("%Y-%m-%d") + "T00:00:00-07:00",
-                    timeMax=end_datetime.strftime("%Y-%m-%d") + "T23:59:59-07:00",
-                    singleEvents=True,
-                    orderBy="startTime",
-                    fields="items(start, end, summary, description)",
-                ).execute()
-            )
-            events = events_result.get("items", [])
-
+        cache_path = self._cache_path(start_datetime, end_datetime)
+        events = None
+        if not self._refresh_cache:
+            events = self._load_cached_events(cache_path, end_datetime)
+        if events is None:
+            events = self._fetch_events(start_datetime, end_datetime)
+            if events is None:
+                return None
+            self._store_cached_events(cache_path, events)
+        events = [
+            Event.from_resource(event)
+            for event in events
+            if "dateTime" in event.get("start", {})
+        ]
+
+        # skip the per-event work entirely unless the log would be written
+        if logging.getLogger().isEnabledFor(logging.INFO):
             for event in events:
-                event["start"]["dateTime"] = datetime.fromisoformat(
-                    event["start"]["dateTime"]
+                # read the times straight from the RFC3339 strings rather than
+                # parsing them a second time just for the log
+                logging.info(
+                    "%d:%s-%d:%s %s",
+                    int(event.start[11:13]) % 12,
+                    event.start[14:16],
+                    int(event.end[11:13]) % 12,
+                    event.end[14:16],
+                    event.summary,
                 )
-                event["end"]["dateTime"] = datetime.fromisoformat(
-                    event["end"]["dateTime"]
+        return events
+
+    def _cache_path(self, start_datetime: datetime, end_datetime: datetime) -> str:
+        """Return the cache file for the events of a datetime range."""
+        key = "{}|{}|{}".format(
+            start_datetime.strftime("%Y-%m-%d"),
+            end_datetime.strftime("%Y-%m-%d"),
+            CALENDAR_ID,
+        )
+        return os.path.join(
+            CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + ".json"
+        )
+
+    def _load_cached_events(
+        self, cache_path: str, end_datetime: datetime
+    ) -> Optional[list[dict]]:
+        """Load cached events, or None if the cache is missing or stale.
+
+        Ranges reaching today or later can still change, so they expire after a
+        few minutes; ranges entirely in the past are kept for a day. An expired
+        file is deleted.
+        """
+        if end_datetime.date() >= date.today():
+            ttl = CACHE_TTL_CURRENT
+        else:
+            ttl = CACHE_TTL_PAST
+        try:
+            if time.time() - os.path.getmtime(cache_path) > ttl:
+                os.remove(cache_path)
+                return None
+            with open(cache_path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+    def _store_cached_events(self, cache_path: str, events: list[dict]):
+        """Write the events to the cache, logging rather than failing on errors.
+
+        The events are private calendar data, so the cache is only readable by the
+        user. The file is written to a temporary path and then moved into place,
+        so concurrent runs never read a partially written cache.
+        """
+        try:
+            os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+            # mkstemp creates the file with 0o600 permissions
+            fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as cache_file:
+                    json.dump(events, cache_file)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError as error:
+            logging.warning(f"Could not cache events: {error}")
+            return
+        self._prune_cache()
+
+    def _prune_cache(self):
+        """Delete cache files older than the longest TTL, so the cache stays small.
+
+        Without this, every distinct range audited would leave a file behind.
+        """
+        now = time.time()
+        try:
+            with os.scandir(CACHE_DIR) as entries:
+                for entry in entries:
+                    if now - entry.stat().st_mtime > CACHE_TTL_PAST:
+                        os.remove(entry.path)
+        except OSError as error:
+            logging.warning(f"Could not prune the event cache: {error}")
+
+    def _fetch_events(
+        self, start_datetime: datetime, end_datetime: datetime
+    ) -> Optional[list[dict]]:
+        """Fetch the events of a datetime range from the Google Calendar API."""
+        creds = self.authenticate_user()
+        try:
+            if self._service is None:
+                # build from the discovery document bundled with the client rather
+                # than fetching it over HTTPS on every run
+                self._service = build(
+                    "calendar",
+                    "v3",
+                    credentials=creds,
+                    static_discovery=True,
+                    cache_discovery=False,
                 )
-                logging.info("{}:{:02d}-{}:{:02d} {}".format(
-                    event["start"]["dateTime"].hour % 12,
-                    event["start"]["dateTime"].minute,
-                    event["end"]["dateTime"].hour % 12,
-                    event["end"]["dateTime"].minute,
-                    event["summary"]))
-            return events
+            service = self._service
+            return self._execute_pages(
+                service, self._list_request(service, start_datetime, end_datetime)
+            )
 
         except HttpError as error:
             logging.error(f"An error occurred: {error}")
 
-    def extract_event_categories(self, event: dict) -> list[str]:
+    def _list_request(
+        self, service, start_datetime: datetime, end_datetime: datetime
+    ) -> HttpRequest:
+        """Build the events.list request for the days of a datetime range."""
+        return service.events().list(
+            calendarId=CALENDAR_ID,
+            # 07:00 is Pacific Time, 05:00 is Central Time
+            timeMin=start_datetime.strftime("%Y-%m-%d") + "T00:00:00-07:00",
+            timeMax=end_datetime.strftime("%Y-%m-%d") + "T23:59:59-07:00",
+            singleEvents=True,
+            orderBy="startTime",
+            maxResults=MAX_RESULTS,
+            # only the timed start/end are requested, so all-day events (which
+            # only have a date) come back without times and are skipped
+            fields=(
+                "items(start/dateTime,end/dateTime,summary,description),"
+                "nextPageToken"
+            ),
+        )
+
+    def _execute_pages(self, service, request: HttpRequest) -> list[dict]:
+        """Execute an events.list request, following nextPageToken to the end."""
+        events = []
+        while request is not None:
+            events_result = request.execute()
+            events.extend(events_result.get("items", []))
+            request = service.events().list_next(request, events_result)
+        return events
+
+    def extract_event_categories(self, event: Event) -> list[str]:
         """Extract the event categories from the event.
 
         Parameters
         ----------
-        event: dict
+        event: Event
             The event to extract the event categories from.
 
         Returns
@@ -163,50 +430,79 @@ class GCalAuditor:
         list[str]
             The event types.
         """
-        if "description" not in event:
-            return [event["summary"]]
+        if event.description is None:
+            return [event.summary]
 
-        pattern = r"\[Tags:(.*?)\]"
-        matches = re.findall(pattern, event["description"])
-        if not matches:
-            return [event["summary"]]
+        tags = _find_tags(event.description)
+        if tags is None:
+            return [event.summary]
 
         categories = []
         # audit first tag
         if self._audit_first_tag_only:
-            return [matches[0].split(",")[0].strip()]
+            return [tags.split(",")[0].strip()]
         # audit all tags
-        for match in matches[0].split(","):
-            categories.append(match.strip())
+        for tag in tags.split(","):
+            categories.append(tag.strip())
 
         return categories
 
-    def categorize_events(self, events: list[dict]) -> dict:
+    def extract_duration(self, event: Event) -> int:
+        """Extract the duration of the event.
+
+        Parameters
+        ----------
+        event: Event
+            The event to extract the duration from.
+
+        Returns
+        -------
+        int
+            The duration of the event in seconds.
+        """
+        return event.duration
+
+    def categorize_events(
+        self, events: list[Event], top_k: Optional[int] = None
+    ) -> dict:
         """Categorize the events.
 
         Parameters
         ----------
-        events: list[dict]
+        events: list[Event]
             The events to categorize.
+        top_k: int, optional
+            Only keep the top_k categories with the longest durations, at least 1.
 
         Returns
         -------
         dict
             The categorization of the events.
         """
-        durations = {}
+        if top_k is not None and top_k < 1:
+            raise ValueError(f"top_k must be at least 1, got {top_k}")
+        audit_first_tag_only = self._audit_first_tag_only
+        durations = defaultdict(int)
+        # bind the per-event lookups to locals, this loop dominates large audits
+        find_tags = _find_tags
+        # extract the categories and duration of each event in a single pass; this
+        # mirrors extract_event_categories and extract_duration
         for event in events:
-            event_types = self.extract_event_categories(event)
-            event_duration = (
-                (event["end"]["dateTime"] - event["start"]["dateTime"])
-            ).total_seconds()
-            for event_type in event_types:
-                durations.update({
-                    event_type: durations.get(event_type, 0) + event_duration
-                })
+            event_duration = event.duration
+            description = event.description
+            tags = find_tags(description) if description else None
+            if tags is None:
+                durations[event.summary] += event_duration
+            elif audit_first_tag_only:
+                durations[tags.split(",", 1)[0].strip()] += event_duration
+            else:
+                for tag in tags.split(","):
+                    durations[tag.strip()] += event_duration
 
         # Sort the durations dictionary by values (descending order)
-        return dict(sorted(durations.items(), key=lambda item: item[1], reverse=True))
+        if top_k is not None:
+            return dict(heapq.nlargest(top_k, durations.items(), key=itemgetter(1)))
+        return dict(sorted(durations.items(), key=itemgetter(1), reverse=True))
 
     def print_analysis(self, categories: dict):
         """Print the analysis of the event categories.
@@ -221,42 +517,35 @@ class GCalAuditor:
         None
         """
         # title
-        event_type_max_len = max(len(event_type) for event_type in categories.keys())
-        col1 = f"{'Event Type':^{event_type_max_len}}"
-        col2 = f"{'Duration':^8}"
-        col3 = f"{'% of Total':^10}"
-        title = f"| {col1} | {col2} | {col3} |"
-        print(f"+{'-' * (len(title)-2)}+")
-        print(title)
-        print(f"+{'-' * (len(title)-2)}+")
+        event_type_max_len = max(map(len, categories))
+        row_format = "| {:^%d} | {:^8} | {:^10} |" % event_type_max_len
+        title = row_format.format("Event Type", "Duration", "% of Total")
+        rule = f"+{'-' * (len(title)-2)}+"
+        rows = [rule, title, rule]
         # data
+        percent_per_second = 100 / self._total_duration
         tracked_duration = 0
         for event_type, seconds in categories.items():
             tracked_duration += seconds
-            minutes = seconds // SECS_IN_MINUTE
-            hours = minutes // MINUTES_IN_HOUR
-            minutes = minutes % MINUTES_IN_HOUR
-            duration = f"{int(hours)}:{int(minutes):02d}"
-            percent_of_total = f"{round((seconds / self._total_duration) * 100, 2):.2f}"
-            col1 = f"{event_type:^{event_type_max_len}}"
-            col2 = f"{duration:^8}"
-            col3 = f"{percent_of_total:^10}"
-            print(f"| {col1} | {col2} | {col3} |")
-        print(f"+{'-' * (len(title)-2)}+")
+            hours, minutes = divmod(int(seconds) // SECS_IN_MINUTE, MINUTES_IN_HOUR)
+            rows.append(row_format.format(
+                event_type,
+                f"{hours}:{minutes:02d}",
+                f"{seconds * percent_per_second:.2f}",
+            ))
+        rows.append(rule)
         # total
         if self._audit_first_tag_only:
-            minutes = tracked_duration // SECS_IN_MINUTE
-            hours = minutes // MINUTES_IN_HOUR
-            minutes = minutes % MINUTES_IN_HOUR
-            duration = f"{int(hours)}:{int(minutes):02d}"
-            percent_of_total = (
-                f"{round((tracked_duration / self._total_duration) * 100, 2):.2f}"
+            hours, minutes = divmod(
+                int(tracked_duration) // SECS_IN_MINUTE, MINUTES_IN_HOUR
             )
-            col1 = f"{'Total':^{event_type_max_len}}"
-            col2 = f"{duration:^8}"
-            col3 = f"{percent_of_total:^10}"
-            print(f"| {col1} | {col2} | {col3} |")
-            print(f"+{'-' * (len(title)-2)}+")
+            rows.append(row_format.format(
+                "Total",
+                f"{hours}:{minutes:02d}",
+                f"{tracked_duration * percent_per_second:.2f}",
+            ))
+            rows.append(rule)
+        print("\n".join(rows))
 
     def set_tag_option(self):
         # audit the first tag only
@@ -272,7 +561,7 @@ class GCalAuditor:
         if not events:
             print(f"No events found for {start_datetime}-{end_datetime}")
             return
-        categories = self.categorize_events(events)
+        categories = self.categorize_events(events, self._top_k)
         self.print_analysis(categories)
 
     def audit_day(self):
@@ -283,29 +572,34 @@ class GCalAuditor:
     def audit_week(self):
         self.set_tag_option()
         print(self._audit_first_tag_only)
-        # audit week
         start_datetime, end_datetime = self._date_inputter.input_week()
+        self._audit_week(start_datetime, end_datetime)
+
+    def _audit_week(self, start_datetime: datetime, end_datetime: datetime):
+        # audit week
         events = self.query_events(start_datetime, end_datetime)
         if not events:
             print(f"No events found for {start_datetime}-{end_datetime}")
             return
-        categories = self.categorize_events(events)
+        categories = self.categorize_events(events, self._top_k)
         self.print_analysis(categories)
 
+        # bucket the events by their start date in a single pass
+        events_by_day = defaultdict(list)
+        for event in events:
+            events_by_day[event.start[:10]].append(event)
+
         # audit each day of the week
         cur_datetime = start_datetime
         while cur_datetime <= end_datetime:
-            cur_events = []
             self._total_duration = SECS_IN_DAY
             print(DAYS_OF_WEEK[cur_datetime.weekday()], cur_datetime.date())
-            for event in events:
-                if event["start"]["dateTime"].day == cur_datetime.day:
-                    cur_events.append(event)
+            cur_events = events_by_day.get(cur_datetime.strftime("%Y-%m-%d"))
             if not cur_events:
                 print(f"No events found for {cur_datetime}")
                 cur_datetime += timedelta(days=1)
                 continue
-            categories = self.categorize_events(cur_events)
+            categories = self.categorize_events(cur_events, self._top_k)
             self.print_analysis(categories)
             cur_datetime += timedelta(days=1)
 
@@ -332,10 +626,127 @@ class GCalAuditor:
             print("INVALID OPTION. TRY AGAIN.\n")
             return self.audit()
 
+    def audit_args(self, args: argparse.Namespace):
+        """Run an audit without prompting, as described by the command line.
+
+        Parameters
+        ----------
+        args: argparse.Namespace
+            The arguments parsed by parse_args.
+        """
+        self._audit_first_tag_only = args.first_tag_only
+        self._top_k = args.top
+        self._refresh_cache = args.refresh
+        if args.mode == "day":
+            self._audit(*self._date_inputter.day(args.start))
+        elif args.mode == "week":
+            self._audit_week(*self._date_inputter.week(args.start))
+        else:
+            start_date, _, start_time = (args.start or "").partition("T")
+            end_date, _, end_time = (args.end or "").partition("T")
+            self._audit(
+                *self._date_inputter.datetime_range(
+                    start_date, start_time, end_date, end_time
+                )
+            )
+
+
+def _normalize_datetime_arg(value: str, formats: list[str]) -> Optional[str]:
+    """Return value rewritten in the first of formats it parses with, or None."""
+    for datetime_format in formats:
+        try:
+            return datetime.strptime(value, datetime_format).strftime(datetime_format)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse the command line arguments for a non-interactive audit.
+
+    Parameters
+    ----------
+    argv: list[str], optional
+        The arguments to parse, sys.argv[1:] by default.
+
+    Returns
+    -------
+    argparse.Namespace
+        The parsed arguments, with --start and --end normalized to YYYY-MM-DD or
+        YYYY-MM-DDTHH:MM.
+    """
+    parser = argparse.ArgumentParser(
+        description="Audit where your time goes in Google Calendar. "
+        "Runs interactively when no arguments are given.",
+        epilog=f"Events are cached in {CACHE_DIR} for 5 minutes when the range "
+        "reaches today and for a day otherwise. Use --refresh after editing "
+        "events to see the changes immediately.",
+    )
+    parser.add_argument("--mode", choices=["day", "week", "range"], required=True)
+    parser.add_argument(
+        "--start",
+        help="the day (YYYY-MM-DD) to audit, or the start of the week or range; "
+        "ranges also accept YYYY-MM-DDTHH:MM. Defaults to today.",
+    )
+    parser.add_argument(
+        "--end",
+        help="the end (YYYY-MM-DD or YYYY-MM-DDTHH:MM) of a range. Defaults to "
+        "the end of the start day.",
+    )
+    parser.add_argument(
+        "--first-tag-only",
+        action="store_true",
+        help="audit only the first tag in each event description",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        metavar="N",
+        help="only print the N categories with the longest durations; the total "
+        "then only counts those categories",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="ignore cached events and query the calendar again",
+    )
+    args = parser.parse_args(argv)
+    if args.top is not None and args.top < 1:
+        parser.error("argument --top: must be at least 1")
+    if args.end and args.mode != "range":
+        parser.error("--end is only supported with --mode range")
+    # validate here so a malformed date is a usage error rather than a traceback
+    if args.mode == "range":
+        formats, expected = ["%Y-%m-%d", "%Y-%m-%dT%H:%M"], "YYYY-MM-DD[THH:MM]"
+    else:
+        formats, expected = ["%Y-%m-%d"], "YYYY-MM-DD"
+    for name in ("start", "end"):
+        value = getattr(args, name)
+        if value is None:
+            continue
+        normalized = _normalize_datetime_arg(value, formats)
+        if normalized is None:
+            parser.error(f"argument --{name}: expected {expected}, got {value!r}")
+        setattr(args, name, normalized)
+    if args.mode == "range":
+        start_date, _, start_time = (args.start or "").partition("T")
+        end_date, _, end_time = (args.end or "").partition("T")
+        try:
+            DateInputter().datetime_range(start_date, start_time, end_date, end_time)
+        except ValueError:
+            parser.error("--end must be after --start")
+    return args
+
 
-def main():
+def main(argv: Optional[list[str]] = None):
+    if argv is None:
+        argv = sys.argv[1:]
     gcal_auditor = GCalAuditor()
-    gcal_auditor.audit()
+    # fall back to the interactive menu when no arguments are given
+    if not argv:
+        gcal_auditor.audit()
+        return
+    gcal_auditor.audit_args(parse_args(argv))
 
 
 if __name__ == "__main__":